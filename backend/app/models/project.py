@@ -37,3 +37,14 @@ class Project(Base):
     owner = relationship("User", back_populates="projects")
     leads = relationship("Lead", back_populates="project")
     email_campaigns = relationship("EmailCampaign", back_populates="project")
+
+    @property
+    def target_titles_list(self):
+        """Parsed target_titles, split and stripped once per instance"""
+        raw = self.target_titles or ""
+        cached = self.__dict__.get("_target_titles_cache")
+        if cached is None or cached[0] != raw:
+            titles = [title.strip() for title in raw.split(",") if title.strip()]
+            self.__dict__["_target_titles_cache"] = (raw, titles)
+            return titles
+        return cached[1]
@@ -1,4 +1,5 @@
 import os
+import re
 import logging
 import openai
 from typing import List, Dict, Any, Optional
@@ -24,6 +25,17 @@ openai.api_key = OPENAI_API_KEY
 # ML Service URL
 ML_SERVICE_URL = os.getenv("ML_SERVICE_URL", "http://ml-service:8000")
 
+# Matches the "Subject:" line wherever the model put it, in one scan
+SUBJECT_LINE_RE = re.compile(r'^[ \t]*Subject:[ \t]*(.*)$', re.MULTILINE)
+
+# Completion budget per requested length; decode latency scales with
+# max_tokens, so don't reserve 1000 tokens for a 3-4 sentence email
+MAX_TOKENS_BY_LENGTH = {
+    "short": 250,
+    "medium": 500,
+    "long": 1000
+}
+
 
 async def generate_email_template(
     db: Session,
@@ -121,7 +133,7 @@ async def generate_email_template(
                 {"role": "user", "content": user_prompt}
             ],
             temperature=0.7,
-            max_tokens=1000
+            max_tokens=MAX_TOKENS_BY_LENGTH.get(length, MAX_TOKENS_BY_LENGTH["medium"])
         )
         
         # Extract the email content
@@ -203,32 +215,18 @@ def _create_email_system_prompt(
 
 def _parse_email_content(content: str) -> tuple:
     """Parse the subject and body from the email content"""
-    
-    # Check if the content starts with "Subject: "
-    if content.startswith("Subject:"):
-        # Split by first blank line
-        parts = content.split("\n\n", 1)
-        
-        if len(parts) >= 2:
-            subject = parts[0].replace("Subject:", "").strip()
-            body = parts[1].strip()
-            return subject, body
-    
-    # Fallback: Try to find "Subject:" anywhere in the content
-    subject_index = content.find("Subject:")
-    if subject_index >= 0:
-        subject_line = content[subject_index:].split("\n", 1)[0]
-        subject = subject_line.replace("Subject:", "").strip()
-        
-        # Body is everything after the subject line
-        body_start = content.find(subject) + len(subject)
-        body = content[body_start:].strip()
-        
+
+    # One pass with a compiled regex handles both the leading-subject
+    # and subject-anywhere cases that used to be scanned separately
+    match = SUBJECT_LINE_RE.search(content)
+    if match:
+        subject = match.group(1).strip()
+        body = content[match.end():].strip()
         return subject, body
-    
+
     # Fallback: Use first line as subject
-    lines = content.split("\n")
-    return lines[0], "\n".join(lines[1:]).strip()
+    first_line, _, rest = content.partition("\n")
+    return first_line, rest.strip()
 
 
 async def predict_email(
@@ -6,10 +6,11 @@ import httpx
 from sqlalchemy.orm import Session
 
 from worker import celery_app
-from app.database import SessionLocal
+from app.database import TaskSession
 from app.models.email_campaign import EmailCampaign, EmailTemplate
 from app.models.lead import Lead
 from app.models.project import Project
+from app.services.ai import generate_email_template as generate_email_template_service
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,7 +27,7 @@ def send_email_campaign(campaign_id: int):
     """
     logger.info(f"Starting task to send email campaign {campaign_id}")
     
-    db = SessionLocal()
+    db = TaskSession()
     try:
         # Get campaign
         campaign = db.query(EmailCampaign).filter(EmailCampaign.id == campaign_id).first()
@@ -95,7 +96,7 @@ def send_email_campaign(campaign_id: int):
         return {"status": "error", "message": str(e)}
         
     finally:
-        db.close()
+        TaskSession.remove()
 
 
 @celery_app.task(name="generate_email_template")
@@ -122,12 +123,10 @@ def generate_email_template(
     """
     logger.info(f"Starting task to generate email template for project {project_id}")
     
-    db = SessionLocal()
+    db = TaskSession()
     try:
         # Call the AI service to generate the template
-        from app.services.ai import generate_email_template
-        
-        template = generate_email_template(
+        template = generate_email_template_service(
             db=db,
             lead_ids=lead_ids,
             project_id=project_id,
@@ -151,7 +150,7 @@ def generate_email_template(
         return {"status": "error", "message": str(e)}
         
     finally:
-        db.close()
+        TaskSession.remove()
 
 
 def _simulate_email_send(campaign: EmailCampaign, template: EmailTemplate, lead: Lead) -> None:
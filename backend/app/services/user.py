@@ -1,27 +1,60 @@
 from sqlalchemy.orm import Session
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 from app.models.user import User
 
 
+def _user_cache(db: Session) -> Dict[Tuple[str, Any], Optional[User]]:
+    """
+    Per-session memo for user lookups.
+
+    Sessions live for a single request (or Celery task), so caching on
+    db.info gives request-scoped memoization: repeated auth/ownership
+    checks hit the dict instead of re-querying, and nothing can leak
+    across requests or hold stale ORM instances.
+    """
+    return db.info.setdefault("user_cache", {})
+
+
+def _invalidate_user_cache(db: Session) -> None:
+    """Drop memoized user lookups after a write"""
+    db.info.pop("user_cache", None)
+
+
 def get_user(db: Session, user_id: int) -> Optional[User]:
     """Get a user by ID"""
-    return db.query(User).filter(User.id == user_id).first()
+    cache = _user_cache(db)
+    key = ("id", user_id)
+    if key not in cache:
+        cache[key] = db.query(User).filter(User.id == user_id).first()
+    return cache[key]
 
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     """Get a user by email"""
-    return db.query(User).filter(User.email == email).first()
+    cache = _user_cache(db)
+    key = ("email", email)
+    if key not in cache:
+        cache[key] = db.query(User).filter(User.email == email).first()
+    return cache[key]
 
 
 def get_user_by_username(db: Session, username: str) -> Optional[User]:
     """Get a user by username"""
-    return db.query(User).filter(User.username == username).first()
+    cache = _user_cache(db)
+    key = ("username", username)
+    if key not in cache:
+        cache[key] = db.query(User).filter(User.username == username).first()
+    return cache[key]
 
 
 def get_users(db: Session, skip: int = 0, limit: int = 100):
     """Get a list of users"""
-    return db.query(User).offset(skip).limit(limit).all()
+    cache = _user_cache(db)
+    key = ("list", skip, limit)
+    if key not in cache:
+        cache[key] = db.query(User).offset(skip).limit(limit).all()
+    return cache[key]
 
 
 def create_user(db: Session, user_data: Dict[str, Any], hashed_password: str) -> User:
@@ -37,6 +70,7 @@ def create_user(db: Session, user_data: Dict[str, Any], hashed_password: str) ->
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    _invalidate_user_cache(db)
     return db_user
 
 
@@ -52,6 +86,7 @@ def update_user(db: Session, user_id: int, user_data: Dict[str, Any]) -> Optiona
             
     db.commit()
     db.refresh(db_user)
+    _invalidate_user_cache(db)
     return db_user
 
 
@@ -63,4 +98,5 @@ def delete_user(db: Session, user_id: int) -> bool:
         
     db.delete(db_user)
     db.commit()
+    _invalidate_user_cache(db)
     return True
@@ -1,6 +1,6 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import os
@@ -18,13 +18,19 @@ from app.schemas import (
 )
 from app.routers import leads, auth, projects, emails, ai, analytics, users
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables at import for the demo setup; schema is also
+# managed by Alembic, so deployments that run migrations can disable
+# this duplicate DDL pass (and its startup round-trips) via env
+if os.getenv("DB_AUTO_CREATE", "true").lower() in ("1", "true", "yes"):
+    Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Lead Generation API",
     description="API for AI-Powered Lead Generation Tool",
     version="0.1.0",
+    # orjson serializes large lead/analytics payloads several times
+    # faster than the stdlib json encoder
+    default_response_class=ORJSONResponse,
 )
 
 # Session middleware for OAuth - MUST come before other middleware
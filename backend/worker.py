@@ -22,14 +22,32 @@ celery_app = Celery(
 # Configure Celery
 celery_app.conf.update(
     task_serializer="json",
-    accept_content=["json"],
+    # msgpack is accepted for tasks carrying large payloads (CSV import
+    # bodies); binary framing skips JSON string escaping on both ends
+    accept_content=["json", "msgpack"],
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
     task_time_limit=1800,  # 30 minutes
+    # Scraper/email tasks run for minutes; prefetching more than one
+    # message per worker would let an idle worker hoard queued tasks
     worker_prefetch_multiplier=1,
+    # Late acks only help if a task whose worker died is also requeued
+    # rather than marked failed and acked
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
     worker_max_tasks_per_child=200,
+    # Route workloads to dedicated queues so a burst of slow scrapes or
+    # CPU-heavy CSV imports can't starve email sending (workers are
+    # started per queue, e.g. `celery worker -Q scraper`)
+    task_default_queue="default",
+    task_routes={
+        "scrape_project_data": {"queue": "scraper"},
+        "import_leads_from_csv": {"queue": "imports"},
+        "send_email_campaign": {"queue": "emails"},
+        "generate_email_template": {"queue": "emails"},
+    },
 )
 
 if __name__ == "__main__":
@@ -1,10 +1,13 @@
+import asyncio
 import os
-import openai
+import re
 import logging
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 import json
 
+from openai import AsyncOpenAI
+
 # Load environment variables
 load_dotenv()
 
@@ -14,7 +17,72 @@ logger = logging.getLogger(__name__)
 
 # OpenAI API configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "dummy-key")
-openai.api_key = OPENAI_API_KEY
+
+# Shared async client; the blocking client would stall the event loop
+# for the full duration of each completion call
+openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+# Guidelines for the system prompt, keyed by request parameter
+TONE_GUIDELINES = {
+    "professional": "Use a formal and professional tone. Be respectful and concise.",
+    "friendly": "Use a warm and approachable tone. Be personable while maintaining professionalism.",
+    "casual": "Use a conversational and relaxed tone. Be casual but still respectful."
+}
+
+LENGTH_GUIDELINES = {
+    "short": "Keep the email brief and to the point, around 3-4 sentences.",
+    "medium": "Write a moderately sized email with 1-2 short paragraphs.",
+    "long": "Create a comprehensive email with 2-3 paragraphs of detail."
+}
+
+FOCUS_GUIDELINES = {
+    "benefits": "Focus on the specific benefits our solution can provide to the recipient's business.",
+    "problems": "Focus on the problems the recipient might be facing and how our solution solves them.",
+    "curiosity": "Focus on creating curiosity about our solution without revealing too much detail."
+}
+
+# Static prompt skeleton built once at import; per-call parameters are
+# substituted with format_map instead of re-concatenating every piece
+SYSTEM_PROMPT_TEMPLATE = (
+    "You are an expert email copywriter specializing in B2B outreach emails. "
+    "{tone_guideline} {length_guideline} {focus_guideline}\n\n"
+    "The email should:\n"
+    "1. Have a compelling subject line\n"
+    "2. Start with a personalized introduction\n"
+    "3. Briefly explain who you are\n"
+    "4. Present the value proposition clearly\n"
+    "5. Include a specific call to action for a meeting\n"
+    "6. End with a professional sign-off\n\n"
+    "About our project/product: {project_description}\n\n"
+    "Format your response like this:\n"
+    "Subject: [Email Subject]\n\n"
+    "[Email Body]"
+)
+
+# Matches the "Subject:" line wherever the model put it, in one scan
+SUBJECT_LINE_RE = re.compile(r'^[ \t]*Subject:[ \t]*(.*)$', re.MULTILINE)
+
+# Completion budget per requested length; a 3-4 sentence email never
+# needs the old flat 800-token ceiling, and decode time scales with it
+MAX_TOKENS_BY_LENGTH = {
+    "short": 200,
+    "medium": 450,
+    "long": 800
+}
+
+# Fallback email skeletons built once at import; per-lead values are
+# substituted with format_map like the system prompt template
+FALLBACK_SUBJECT_TEMPLATE = "Quick question about {company}'s lead generation"
+
+FALLBACK_BODY_TEMPLATE = (
+    "Hi {first_name},\n\n"
+    "I noticed {company} and wanted to reach out about {project_name}. "
+    "We've been helping companies in the {industry} space "
+    "improve their lead generation process.\n\n"
+    "Would you be open to a 15-minute call next week to explore if this might be valuable for your team?\n\n"
+    "Best regards,\n"
+    "[Your Name]\n"
+)
 
 
 class EmailGenerator:
@@ -88,15 +156,15 @@ class EmailGenerator:
                 f"The email should introduce our product/service and request a brief meeting."
             )
             
-            # Make OpenAI API call
-            response = openai.chat.completions.create(
+            # Make OpenAI API call without blocking the event loop
+            response = await openai_client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.7,
-                max_tokens=800
+                max_tokens=MAX_TOKENS_BY_LENGTH.get(length, MAX_TOKENS_BY_LENGTH["medium"])
             )
             
             # Extract the email content
@@ -130,77 +198,27 @@ class EmailGenerator:
         project_description: str
     ) -> str:
         """Create system prompt based on parameters"""
-        
-        # Define tone guidelines
-        tone_guidelines = {
-            "professional": "Use a formal and professional tone. Be respectful and concise.",
-            "friendly": "Use a warm and approachable tone. Be personable while maintaining professionalism.",
-            "casual": "Use a conversational and relaxed tone. Be casual but still respectful."
-        }
-        
-        # Define length guidelines
-        length_guidelines = {
-            "short": "Keep the email brief and to the point, around 3-4 sentences.",
-            "medium": "Write a moderately sized email with 1-2 short paragraphs.",
-            "long": "Create a comprehensive email with 2-3 paragraphs of detail."
-        }
-        
-        # Define focus guidelines
-        focus_guidelines = {
-            "benefits": "Focus on the specific benefits our solution can provide to the recipient's business.",
-            "problems": "Focus on the problems the recipient might be facing and how our solution solves them.",
-            "curiosity": "Focus on creating curiosity about our solution without revealing too much detail."
-        }
-        
-        # Create the system prompt
-        system_prompt = (
-            "You are an expert email copywriter specializing in B2B outreach emails. "
-            f"{tone_guidelines.get(tone, tone_guidelines['professional'])} "
-            f"{length_guidelines.get(length, length_guidelines['medium'])} "
-            f"{focus_guidelines.get(focus, focus_guidelines['benefits'])}\n\n"
-            "The email should:\n"
-            "1. Have a compelling subject line\n"
-            "2. Start with a personalized introduction\n"
-            "3. Briefly explain who you are\n"
-            "4. Present the value proposition clearly\n"
-            "5. Include a specific call to action for a meeting\n"
-            "6. End with a professional sign-off\n\n"
-            f"About our project/product: {project_description}\n\n"
-            "Format your response like this:\n"
-            "Subject: [Email Subject]\n\n"
-            "[Email Body]"
-        )
-        
-        return system_prompt
+        return SYSTEM_PROMPT_TEMPLATE.format_map({
+            "tone_guideline": TONE_GUIDELINES.get(tone, TONE_GUIDELINES['professional']),
+            "length_guideline": LENGTH_GUIDELINES.get(length, LENGTH_GUIDELINES['medium']),
+            "focus_guideline": FOCUS_GUIDELINES.get(focus, FOCUS_GUIDELINES['benefits']),
+            "project_description": project_description
+        })
     
     def _parse_email_content(self, content: str) -> tuple:
         """Parse the subject and body from the email content"""
-        
-        # Check if the content starts with "Subject: "
-        if content.startswith("Subject:"):
-            # Split by first blank line
-            parts = content.split("\n\n", 1)
-            
-            if len(parts) >= 2:
-                subject = parts[0].replace("Subject:", "").strip()
-                body = parts[1].strip()
-                return subject, body
-        
-        # Fallback: Try to find "Subject:" anywhere in the content
-        subject_index = content.find("Subject:")
-        if subject_index >= 0:
-            subject_line = content[subject_index:].split("\n", 1)[0]
-            subject = subject_line.replace("Subject:", "").strip()
-            
-            # Body is everything after the subject line
-            body_start = content.find(subject) + len(subject)
-            body = content[body_start:].strip()
-            
+
+        # One pass with a compiled regex handles both the leading-subject
+        # and subject-anywhere cases that used to be scanned separately
+        match = SUBJECT_LINE_RE.search(content)
+        if match:
+            subject = match.group(1).strip()
+            body = content[match.end():].strip()
             return subject, body
-        
+
         # Fallback: Use first line as subject
-        lines = content.split("\n")
-        return lines[0], "\n".join(lines[1:]).strip()
+        first_line, _, rest = content.partition("\n")
+        return first_line, rest.strip()
     
     def _generate_fallback_email(
         self,
@@ -208,23 +226,17 @@ class EmailGenerator:
         project_data: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Generate a fallback template email"""
-        
-        lead_name = f"{lead_data.get('first_name', '')} {lead_data.get('last_name', '')}"
-        lead_company = lead_data.get('company', '')
-        project_name = project_data.get('name', 'our solution')
-        
-        subject = f"Quick question about {lead_company}'s lead generation"
-        
-        body = (
-            f"Hi {lead_data.get('first_name', '')},\n\n"
-            f"I noticed {lead_company} and wanted to reach out about {project_name}. "
-            f"We've been helping companies in the {lead_data.get('industry', 'your industry')} space "
-            f"improve their lead generation process.\n\n"
-            f"Would you be open to a 15-minute call next week to explore if this might be valuable for your team?\n\n"
-            f"Best regards,\n"
-            f"[Your Name]\n"
-        )
-        
+
+        fields = {
+            "first_name": lead_data.get('first_name', ''),
+            "company": lead_data.get('company', ''),
+            "industry": lead_data.get('industry') or 'your industry',
+            "project_name": project_data.get('name', 'our solution')
+        }
+
+        subject = FALLBACK_SUBJECT_TEMPLATE.format_map(fields)
+        body = FALLBACK_BODY_TEMPLATE.format_map(fields)
+
         return {
             "subject": subject,
             "body": body,
@@ -243,11 +255,12 @@ async def batch_generate_emails(
     tone: str = "professional",
     length: str = "medium",
     focus: str = "benefits",
-    custom_instructions: Optional[str] = None
+    custom_instructions: Optional[str] = None,
+    max_concurrency: int = 5
 ) -> List[Dict[str, Any]]:
     """
     Generate emails for multiple leads.
-    
+
     Args:
         leads: List of lead data
         project_data: Project information
@@ -255,33 +268,38 @@ async def batch_generate_emails(
         length: Email length
         focus: Email focus
         custom_instructions: Custom instructions
-        
+        max_concurrency: Maximum number of in-flight OpenAI requests
+
     Returns:
         List of generated emails
     """
     generator = EmailGenerator()
-    
-    results = []
-    for lead in leads:
-        try:
-            email = await generator.generate_email(
-                lead_data=lead,
-                project_data=project_data,
-                tone=tone,
-                length=length,
-                focus=focus,
-                custom_instructions=custom_instructions
-            )
-            results.append(email)
-        except Exception as e:
-            logger.error(f"Error generating email for lead {lead.get('id')}: {str(e)}")
-    
-    return results
+
+    # Run the OpenAI calls concurrently, bounded by a semaphore so large
+    # batches don't trip the API rate limits
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def generate_one(lead: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            try:
+                return await generator.generate_email(
+                    lead_data=lead,
+                    project_data=project_data,
+                    tone=tone,
+                    length=length,
+                    focus=focus,
+                    custom_instructions=custom_instructions
+                )
+            except Exception as e:
+                logger.error(f"Error generating email for lead {lead.get('id')}: {str(e)}")
+                return None
+
+    emails = await asyncio.gather(*(generate_one(lead) for lead in leads))
+
+    return [email for email in emails if email is not None]
 
 
 if __name__ == "__main__":
-    import asyncio
-    
     async def test_email_generation():
         # Test lead data
         lead = {
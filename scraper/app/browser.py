@@ -0,0 +1,150 @@
+import asyncio
+import os
+import logging
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright
+from user_agent import generate_user_agent
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Flags for running Chromium inside a container
+BROWSER_ARGS = ['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
+
+# Resource types the scrapers never read from the DOM; aborting them
+# cuts most of the bytes a page load would otherwise pull
+BLOCKED_RESOURCE_TYPES = {
+    "image", "font", "media", "stylesheet", "beacon", "imageset",
+    "texttrack", "websocket", "csp_report", "object"
+}
+
+
+async def _block_assets(route):
+    """Route handler that drops requests for blocked resource types"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class BrowserPool:
+    """
+    One shared Chromium with a fixed pool of reusable pages.
+
+    Cold-starting a browser costs seconds and dominated the latency of
+    every scrape; the pool launches Chromium once per process and hands
+    out pre-created pages (each in its own context with its own user
+    agent), so a scrape pays a queue round-trip instead of a launch.
+    Started eagerly from the FastAPI startup hook, or lazily on first
+    acquire inside a Celery worker.
+
+    With CHROME_PROFILE set (or user_data_dir passed), the pool runs a
+    persistent context instead: cookies and the HTTP cache live in that
+    directory and survive restarts, so a manually seeded LinkedIn
+    session keeps the scraper past the login wall and framework bundles
+    load from disk on repeat visits. All pooled pages then share the
+    one profile (and its real user agent) rather than getting fresh
+    randomized contexts.
+    """
+
+    def __init__(self, max_pages: int = None, headless: bool = True,
+                 user_data_dir: str = None):
+        self.max_pages = max_pages or int(os.getenv("BROWSER_POOL_PAGES", "4"))
+        self.headless = headless
+        self.user_data_dir = user_data_dir or os.getenv("CHROME_PROFILE")
+        self._playwright = None
+        self._browser = None
+        self._pages: asyncio.Queue = asyncio.Queue()
+        self._start_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """Launch the browser and pre-create the page pool (idempotent)"""
+        async with self._start_lock:
+            if self._browser is not None:
+                return
+
+            playwright = await async_playwright().start()
+            try:
+                if self.user_data_dir:
+                    browser = await self._start_persistent(playwright)
+                else:
+                    browser = await self._start_pooled(playwright)
+            except Exception:
+                await playwright.stop()
+                raise
+
+            self._playwright = playwright
+            self._browser = browser
+            logger.info(f"Browser pool started with {self.max_pages} pages")
+
+    async def _start_pooled(self, playwright):
+        """Default mode: blank contexts, one random user agent each"""
+        browser = await playwright.chromium.launch(
+            headless=self.headless,
+            args=BROWSER_ARGS
+        )
+        for _ in range(self.max_pages):
+            context = await browser.new_context(user_agent=generate_user_agent())
+            await context.route("**/*", _block_assets)
+            self._pages.put_nowait(await context.new_page())
+        return browser
+
+    async def _start_persistent(self, playwright):
+        """Profile mode: one persistent context shared by every page"""
+        context = await playwright.chromium.launch_persistent_context(
+            user_data_dir=self.user_data_dir,
+            headless=self.headless,
+            args=BROWSER_ARGS
+        )
+        await context.route("**/*", _block_assets)
+
+        # The session cookie can only be seeded by logging in manually
+        # through this profile once; warn early when it's missing
+        cookies = await context.cookies("https://www.linkedin.com")
+        if not any(cookie["name"] == "li_at" for cookie in cookies):
+            logger.warning(
+                f"No LinkedIn session cookie in profile {self.user_data_dir}; "
+                "log in through this profile once to get past the login wall"
+            )
+
+        # A persistent context opens with one blank page already
+        pages = list(context.pages)
+        while len(pages) < self.max_pages:
+            pages.append(await context.new_page())
+        for page in pages:
+            self._pages.put_nowait(page)
+
+        # BrowserContext.close() tears down the whole persistent
+        # browser, so it can stand in for the browser handle
+        return context
+
+    async def stop(self) -> None:
+        """Close the browser and drop the pooled pages"""
+        async with self._start_lock:
+            if self._browser is None:
+                return
+
+            self._pages = asyncio.Queue()
+            await self._browser.close()
+            await self._playwright.stop()
+            self._browser = None
+            self._playwright = None
+            logger.info("Browser pool stopped")
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a page from the pool, returning it when done"""
+        if self._browser is None:
+            await self.start()
+
+        page = await self._pages.get()
+        try:
+            yield page
+        finally:
+            self._pages.put_nowait(page)
+
+
+# Shared pool for the whole process
+browser_pool = BrowserPool()
@@ -19,17 +19,40 @@ def create_celery():
     )
     
     # Configure Celery
+    #
+    # Each task blocks its worker process while the scrape runs on the
+    # process-wide asyncio loop (see app.runner), so use the prefork
+    # pool with a small process count, e.g.:
+    #     celery -A app.celery_worker worker -c 2
+    # (a gevent/eventlet pool can't run these tasks: its greenlets
+    # share one thread and would all block on the same loop). Scrapes
+    # run for minutes, so with acks_late a prefetch above 1 only lets
+    # a busy child hoard queued scrapes; acks_late plus
+    # reject_on_worker_lost requeues anything in flight if a worker
+    # dies mid-scrape.
+    # msgpack packs the scrape payloads (lots of small strings) roughly
+    # 2-3x smaller and faster than stdlib json; json stays accepted so
+    # in-flight tasks survive a rolling deploy
     celery.conf.update(
-        task_serializer="json",
-        accept_content=["json"],
-        result_serializer="json",
+        task_serializer="msgpack",
+        accept_content=["msgpack", "json"],
+        result_serializer="msgpack",
         timezone="UTC",
         enable_utc=True,
-        worker_prefetch_multiplier=1,
+        worker_prefetch_multiplier=int(os.getenv("CELERY_PREFETCH", "1")),
         worker_max_tasks_per_child=100,
+        task_acks_late=True,
+        task_reject_on_worker_lost=True,
+        task_default_queue="default",
+        # Keep scrape jobs on their own queue so a long crawl backlog
+        # can't starve whatever else shares the broker
+        task_routes={
+            "app.tasks.scrape_leads_task": {"queue": "scrape"},
+            "app.tasks.scrape_project_task": {"queue": "scrape"},
+        },
         broker_connection_retry_on_startup=True
     )
-    
+
     return celery
 
 
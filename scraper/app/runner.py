@@ -0,0 +1,32 @@
+import asyncio
+import threading
+from typing import Any, Coroutine
+
+# One asyncio loop per worker process, living in its own daemon thread.
+# Celery tasks submit their coroutines here and block on the result, so
+# loop-bound singletons (the browser pool, the pooled HTTP clients and
+# the aiohttp session) are created once on this loop and stay usable
+# for every task the process runs. Running each task under its own
+# asyncio.run would close the loop those resources were bound to and
+# break every scrape after the first.
+_loop: asyncio.AbstractEventLoop = None
+_loop_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """The process-wide loop, started in its thread on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever,
+                name="scrape-loop",
+                daemon=True
+            ).start()
+    return _loop
+
+
+def run(coro: Coroutine) -> Any:
+    """Run a coroutine on the shared loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result()
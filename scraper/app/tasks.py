@@ -1,17 +1,60 @@
 import asyncio
 import logging
+import os
+from functools import lru_cache
 import httpx
+import orjson
 from typing import Dict, Any, Optional, List
 import json
 import time
 
-from app.linkedin import scrape_linkedin_profiles
-from app.website import scrape_website_contact_data, predict_email_format
+from celery.signals import worker_process_init, worker_process_shutdown
+
+from app import runner
+from app.browser import browser_pool
+from app.celery_worker import celery_app
+from app.linkedin import scrape_linkedin_profiles, http_client
+from app.website import scrape_website_contact_data, predict_email_format, close_session
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Email format templates built once at import; per-call values are
+# substituted with format_map instead of rebuilding the dict of
+# f-strings for every prediction
+_EMAIL_TEMPLATES = {
+    "first.last": "{first}.{last}@{domain}",
+    "firstlast": "{first}{last}@{domain}",
+    "first_last": "{first}_{last}@{domain}",
+    "flast": "{first_initial}{last}@{domain}",
+    "first": "{first}@{domain}",
+    "first.last.initial": "{first}.{last}.{first_initial}@{domain}"
+}
+
+# Per-rank confidence multipliers (1 - 0.1*rank), precomputed for the
+# six known formats
+_CONFIDENCE_WEIGHTS = (1.0, 0.9, 0.8, 0.7, 0.6, 0.5)
+
+# Shared client for callback POSTs; reusing pooled connections avoids
+# re-establishing TLS to the backend for every result shipped
+_callback_client = httpx.AsyncClient(
+    timeout=30,
+    limits=httpx.Limits(max_connections=32)
+)
+
+
+@lru_cache(maxsize=4096)
+def _domain_for_company(company: str) -> str:
+    """
+    Map a company name to a domain.
+
+    In a real implementation, you would have logic to convert company
+    names to domains; for demo, we derive dummy domains. Cached so the
+    transform runs once per unique company across a worker's lifetime.
+    """
+    return company.lower().replace(" ", "") + ".com"
+
 
 async def scrape_leads_task(
     task_id: str,
@@ -121,27 +164,53 @@ async def scrape_project_task(
         max_results=max_results
     )
     
-    # Process company domains from LinkedIn results
-    company_domains = {}
+    # Deduplicate companies from the LinkedIn results with a set and
+    # collect (company, domain) pairs; profiles without a company are
+    # skipped before any transform work happens
+    seen = set()
+    company_domains = []
     for profile in linkedin_results:
-        company = profile.get("company", "")
-        if company and company not in company_domains:
-            # In a real implementation, you would have logic to convert company names to domains
-            # For demo, we'll create dummy domains
-            domain = company.lower().replace(" ", "") + ".com"
-            company_domains[company] = domain
-    
-    # Scrape websites for each company
+        company = profile.get("company")
+        if not company or company in seen:
+            continue
+        seen.add(company)
+        company_domains.append((company, _domain_for_company(company)))
+    
+    # Scrape company websites concurrently; each crawl is independent
+    # I/O, so fan out under a semaphore instead of awaiting them one by
+    # one, keeping a lid on total in-flight requests across companies
+    scrape_semaphore = asyncio.Semaphore(int(os.getenv("PROJECT_SCRAPE_CONCURRENCY", "16")))
+
+    async def scrape_one_website(company: str, domain: str) -> Optional[Dict[str, Any]]:
+        async with scrape_semaphore:
+            try:
+                return await scrape_website_contact_data(
+                    domain=domain,
+                    company_name=company
+                )
+            except Exception as e:
+                logger.error(f"Error scraping website for {company}: {str(e)}")
+                return None
+
+    # Consume crawls as they finish rather than waiting on the whole
+    # batch; each completed website is shipped to the callback URL
+    # immediately, so a slow last site can't stall every other result
+    website_tasks = [
+        scrape_one_website(company, domain)
+        for company, domain in company_domains
+    ]
     website_results = []
-    for company, domain in company_domains.items():
-        try:
-            website_data = await scrape_website_contact_data(
-                domain=domain,
-                company_name=company
-            )
-            website_results.append(website_data)
-        except Exception as e:
-            logger.error(f"Error scraping website for {company}: {str(e)}")
+    for seq, coro in enumerate(asyncio.as_completed(website_tasks)):
+        result = await coro
+        if result is None:
+            continue
+        website_results.append(result)
+        if callback_url:
+            await send_results_to_callback(callback_url, {
+                "partial": result,
+                "project_id": project_id,
+                "seq": seq
+            })
     
     # Combine results
     combined_results = {
@@ -152,27 +221,101 @@ async def scrape_project_task(
         "status": "completed"
     }
     
-    # Send results to callback URL if provided
+    # Final summary POST for closure after the streamed partials
     if callback_url:
         await send_results_to_callback(callback_url, combined_results)
-    
+
     return combined_results
 
 
+# Celery entry points. The API process only enqueues these by name;
+# the worker runs each async scrape to completion on the process-wide
+# loop (see app.runner), so bursts of scrape requests queue up instead
+# of serializing browser work inside the uvicorn event loop, and the
+# browser pool and pooled HTTP clients stay bound to one live loop
+# across tasks.
+@celery_app.task(name="app.tasks.scrape_leads_task")
+def scrape_leads_celery_task(
+    task_id: str,
+    source: str,
+    params: Dict[str, Any],
+    callback_url: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run scrape_leads_task inside a Celery worker"""
+    return runner.run(scrape_leads_task(
+        task_id=task_id,
+        source=source,
+        params=params,
+        callback_url=callback_url
+    ))
+
+
+@celery_app.task(name="app.tasks.scrape_project_task")
+def scrape_project_celery_task(
+    project_id: int,
+    params: Dict[str, Any],
+    callback_url: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run scrape_project_task inside a Celery worker"""
+    return runner.run(scrape_project_task(
+        project_id=project_id,
+        params=params,
+        callback_url=callback_url
+    ))
+
+
+@worker_process_init.connect
+def warm_browser_pool(**kwargs) -> None:
+    """Launch Chromium once per worker child so the first scrape skips the cold start"""
+    try:
+        runner.run(browser_pool.start())
+    except Exception as e:
+        # The pool retries lazily on first use, so a missing browser
+        # install shouldn't keep the worker from taking tasks
+        logger.warning(f"Browser pool warm-up failed: {str(e)}")
+
+
+async def _close_async_resources() -> None:
+    await browser_pool.stop()
+    await close_session()
+    await http_client.aclose()
+    await _callback_client.aclose()
+
+
+@worker_process_shutdown.connect
+def close_worker_resources(**kwargs) -> None:
+    """
+    Close Chromium and the pooled HTTP clients before the child exits.
+
+    Also runs when worker_max_tasks_per_child recycles the process, so
+    recycled children don't leave browsers behind.
+    """
+    try:
+        runner.run(_close_async_resources())
+    except Exception as e:
+        logger.warning(f"Worker resource cleanup failed: {str(e)}")
+
+
 async def send_results_to_callback(
     callback_url: str,
     results: Dict[str, Any]
 ) -> None:
-    """Send results to a callback URL"""
+    """Send results to a callback URL over the shared client"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                callback_url,
-                json=results,
-                timeout=30
-            )
-            if response.status_code != 200:
-                logger.error(f"Error sending results to callback URL: {response.status_code} {response.text}")
+        # Encode with orjson instead of httpx's stdlib json path; on
+        # dict-heavy scrape payloads the C encoder is several times
+        # faster, and the numpy option covers scores that leak through
+        # as numpy scalars
+        response = await _callback_client.post(
+            callback_url,
+            content=orjson.dumps(
+                results,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            ),
+            headers={'Content-Type': 'application/json'}
+        )
+        if response.status_code != 200:
+            logger.error(f"Error sending results to callback URL: {response.status_code} {response.text}")
     except Exception as e:
         logger.error(f"Error sending results to callback URL: {str(e)}")
 
@@ -205,43 +348,33 @@ async def predict_email(
     formats = format_prediction["formats"]
     confidence = format_prediction["confidence"]
     
-    # Clean names
+    # Clean names; substitution fields are shared by every template
     first = first_name.lower().strip()
     last = last_name.lower().strip()
-    first_initial = first[0] if first else ""
-    last_initial = last[0] if last else ""
-    
-    # Generate predictions
-    predictions = []
-    
-    # Email format templates
-    email_templates = {
-        "first.last": f"{first}.{last}@{company_domain}",
-        "firstlast": f"{first}{last}@{company_domain}",
-        "first_last": f"{first}_{last}@{company_domain}",
-        "flast": f"{first_initial}{last}@{company_domain}",
-        "first": f"{first}@{company_domain}",
-        "first.last.initial": f"{first}.{last}.{first_initial}@{company_domain}"
+    fields = {
+        "first": first,
+        "last": last,
+        "first_initial": first[:1],
+        "domain": company_domain
     }
-    
-    # Add predictions based on formats
-    base_confidence = confidence
-    for i, format_name in enumerate(formats):
-        if format_name in email_templates:
-            email = email_templates[format_name]
-            format_confidence = base_confidence * (1 - (i * 0.1))  # Decrease confidence for less likely formats
-            
-            predictions.append({
-                "email": email,
-                "format": format_name,
-                "confidence": round(format_confidence, 2)
-            })
-    
+
+    # Predictions per format, with confidence decreasing for less
+    # likely formats via the precomputed weight table
+    predictions = [
+        {
+            "email": _EMAIL_TEMPLATES[format_name].format_map(fields),
+            "format": format_name,
+            "confidence": round(confidence * _CONFIDENCE_WEIGHTS[i], 2)
+        }
+        for i, format_name in enumerate(formats[:len(_CONFIDENCE_WEIGHTS)])
+        if format_name in _EMAIL_TEMPLATES
+    ]
+
     # If no predictions were made, use default formats
     if not predictions:
         predictions = [
-            {"email": email_templates["first.last"], "format": "first.last", "confidence": 0.5},
-            {"email": email_templates["firstlast"], "format": "firstlast", "confidence": 0.3}
+            {"email": _EMAIL_TEMPLATES["first.last"].format_map(fields), "format": "first.last", "confidence": 0.5},
+            {"email": _EMAIL_TEMPLATES["firstlast"].format_map(fields), "format": "firstlast", "confidence": 0.3}
         ]
     
     return {
@@ -1,9 +1,16 @@
+import concurrent.futures
+import hashlib
+import os
 import re
-import requests
+import socket
+from collections import Counter
+import diskcache
 from urllib.parse import urljoin, urlparse
 from typing import List, Dict, Any, Optional, Set
 import logging
-from bs4 import BeautifulSoup
+# lexbor parses and queries in C, roughly an order of magnitude faster
+# than BeautifulSoup's html.parser on these pages
+from selectolax.lexbor import LexborHTMLParser
 import asyncio
 import aiohttp
 from user_agent import generate_user_agent
@@ -12,6 +19,216 @@ from user_agent import generate_user_agent
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Shared ClientSession created lazily inside the running loop. One
+# connection pool for every crawl keeps TCP/TLS handshakes and DNS
+# lookups amortized across tasks, with a per-host cap so no single
+# site gets hammered.
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """The process-wide HTTP session, (re)created on first use"""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=128,
+            limit_per_host=8,
+            ttl_dns_cache=300,
+            use_dns_cache=True,
+            family=socket.AF_INET
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+    return _session
+
+
+async def close_session() -> None:
+    """Close the shared session (called at worker shutdown)"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+# On-disk LRU cache of raw HTML keyed by URL hash: the same company
+# sites get crawled again and again across projects, and a warm hit
+# skips the network entirely. TTL keeps the copies fresh enough for
+# contact data.
+_CACHE_DIR = os.getenv("SCRAPER_CACHE_DIR", "/var/cache/scraper")
+_CACHE_TTL = int(os.getenv("SCRAPER_CACHE_TTL", str(24 * 3600)))
+
+try:
+    _html_cache = diskcache.Cache(_CACHE_DIR, size_limit=10 * 2**30)
+except Exception as e:
+    logger.warning(f"HTML cache disabled ({str(e)}), fetching everything live")
+    _html_cache = None
+
+
+# Never read more than this many bytes of any one page; contact data
+# lives well within the first couple of megabytes
+_MAX_BODY_BYTES = 2 * 1024 * 1024
+
+
+async def fetch_cached(
+    session: aiohttp.ClientSession,
+    url: str,
+    headers: Dict[str, str],
+    timeout: int
+) -> Optional[str]:
+    """
+    Fetch a URL's HTML through the on-disk cache.
+
+    Returns None for non-200 responses, non-HTML content types, and
+    oversized bodies (none of which are cached), so the crawler never
+    downloads or decodes PDFs, ZIPs, or marketing videos.
+    """
+    key = hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+
+    if _html_cache is not None:
+        cached = _html_cache.get(key)
+        if cached is not None:
+            return cached
+
+    async with session.get(url, headers=headers, timeout=timeout) as response:
+        if response.status != 200:
+            return None
+
+        # Only HTML gets parsed; bail before reading anything else
+        if 'html' not in response.headers.get('Content-Type', 'text/html'):
+            return None
+        if int(response.headers.get('Content-Length', '0')) > _MAX_BODY_BYTES:
+            return None
+
+        # Read raw bytes and decode with the declared charset; this
+        # skips .text()'s charset detection and lets us truncate
+        # servers that lied about (or omitted) Content-Length
+        body = await response.read()
+        if len(body) > _MAX_BODY_BYTES:
+            body = body[:_MAX_BODY_BYTES]
+        html = body.decode(response.charset or 'utf-8', errors='replace')
+
+    if _html_cache is not None:
+        _html_cache.set(key, html, expire=_CACHE_TTL)
+
+    return html
+
+
+# One compiled alternation per key page type, matched once against the
+# URL path, replacing the per-URL loop over raw pattern strings. The
+# trailing group anchors matches at a path-segment boundary so /about
+# doesn't also claim /aboutwidgets.
+_KEY_PAGE_RES = {
+    'team_page_url': re.compile(r'/(team|about-us/team|people|our-team|staff)(/|$|\?)', re.IGNORECASE),
+    'contact_page_url': re.compile(r'/(contact|contact-us|get-in-touch)(/|$|\?)', re.IGNORECASE),
+    'about_page_url': re.compile(r'/(about|about-us|company)(/|$|\?)', re.IGNORECASE)
+}
+
+# Contact patterns compiled once at import instead of per page
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+_PHONE_RE = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+
+# One alternation that both detects a social link and captures which
+# platform it is, so each href is scanned once instead of once per
+# platform pattern
+_SOCIAL_RE = re.compile(r'(linkedin|twitter|facebook|instagram)\.com', re.IGNORECASE)
+
+# Class-name hints that a container holds a team member
+_TEAM_CLASS_RE = re.compile(r'team|member|employee|staff|profile', re.IGNORECASE)
+
+# Pool for the CPU side of a crawl (tree construction, regex scans,
+# anchor walks). Running those via run_in_executor keeps the event
+# loop free to service the other in-flight fetches, and a process pool
+# parses pages on multiple cores. Created lazily so importing the
+# module never forks; falls back to threads where processes can't be
+# spawned.
+_parse_pool: Optional[concurrent.futures.Executor] = None
+
+
+def get_parse_pool() -> concurrent.futures.Executor:
+    """The process-wide parsing executor, created on first use"""
+    global _parse_pool
+    if _parse_pool is None:
+        try:
+            _parse_pool = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+        except OSError as e:
+            logger.warning(f"Process pool unavailable ({str(e)}), parsing in threads")
+            _parse_pool = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count())
+    return _parse_pool
+
+
+def parse_page(
+    html: str,
+    current_url: str,
+    base_domain: str,
+    company_name: str
+) -> tuple:
+    """
+    Parse one fetched page and extract everything of interest.
+
+    Pure function over its arguments with no shared state, so it can
+    run in a pool worker process. Returns an updates dict for the
+    caller to merge into the crawl results, plus the canonicalized
+    same-domain links found on the page.
+    """
+    tree = LexborHTMLParser(html)
+
+    updates: Dict[str, Any] = {
+        'company': company_name,
+        'key_pages': {},
+        'contacts': [],
+        'social_links': {},
+        'emails': set(),
+        'phone_numbers': set()
+    }
+
+    # Check if this is a key page (about, team, contact); the path is
+    # parsed once and each page type is one precompiled search
+    path = urlparse(current_url).path
+    for page_type, pattern in _KEY_PAGE_RES.items():
+        if pattern.search(path):
+            updates['key_pages'][page_type] = current_url
+
+    # Extract contact information straight from the raw HTML
+    extract_contact_info(html, updates)
+
+    # Enumerate anchors once per page; the social-link scan and the
+    # link discovery below share the list instead of walking the tree
+    # twice
+    hrefs = [
+        href for href in (link.attributes.get('href') for link in tree.css('a[href]'))
+        if href
+    ]
+
+    # Extract social links
+    extract_social_links(hrefs, updates)
+
+    # Extract team members if this looks like a team page; the caller
+    # decides whether this page actually won the team_page_url slot
+    if 'team_page_url' in updates['key_pages']:
+        extract_team_members(tree, updates)
+
+    # Collect links to other pages on the same domain
+    new_urls = []
+    seen: Set[str] = set()
+    for href in hrefs:
+        # Make absolute URL
+        if not href.startswith('http'):
+            href = urljoin(current_url, href)
+
+        # Canonicalize so /about, /about/ and /about#team are one
+        # frontier entry
+        href = href.split('#', 1)[0].rstrip('/')
+        if not href or href in seen:
+            continue
+        seen.add(href)
+
+        if urlparse(href).netloc == base_domain:
+            new_urls.append(href)
+
+    return updates, new_urls
+
 
 async def scrape_website_contact_data(
     domain: str,
@@ -33,10 +250,13 @@ async def scrape_website_contact_data(
     """
     logger.info(f"Starting website scrape for domain: {domain}")
     
-    # Ensure domain has proper URL format
+    # Ensure domain has proper URL format, canonicalized like every
+    # other frontier URL
     if not domain.startswith('http'):
         domain = f'https://{domain}'
-        
+    domain = domain.rstrip('/')
+
+
     # Parse domain
     parsed_domain = urlparse(domain)
     base_domain = parsed_domain.netloc
@@ -58,74 +278,85 @@ async def scrape_website_contact_data(
         'phone_numbers': set()
     }
     
-    # Queue of URLs to visit
-    to_visit = [domain]
+    # Frontier queue of URLs to visit, shared by the crawl workers.
+    # URLs are marked in `enqueued` when queued, so membership is O(1)
+    # and a URL can enter the queue at most once; `visited` counts the
+    # pages actually crawled for the max_pages cap.
+    queue: asyncio.Queue = asyncio.Queue()
+    queue.put_nowait(domain)
+    enqueued = {domain}
     visited = set()
-    
-    # Identify key pages (about, team, contact)
-    key_page_patterns = {
-        'team_page_url': [r'/team', r'/about-us/team', r'/people', r'/our-team', r'/staff'],
-        'contact_page_url': [r'/contact', r'/contact-us', r'/get-in-touch'],
-        'about_page_url': [r'/about', r'/about-us', r'/company']
-    }
-    
-    # Set up async HTTP session
-    async with aiohttp.ClientSession() as session:
-        # Process URLs until queue is empty or we reach max_pages
-        while to_visit and len(visited) < max_pages:
-            current_url = to_visit.pop(0)
-            
-            if current_url in visited:
-                continue
-                
-            visited.add(current_url)
-            
+
+    # Fetches run concurrently but capped, so a single site never sees
+    # more than this many in-flight requests from us
+    num_workers = int(os.getenv("CRAWL_CONCURRENCY", "8"))
+
+    async def crawl_page(session: aiohttp.ClientSession, current_url: str) -> None:
+        """Fetch one page, extract everything, enqueue same-domain links"""
+        # Random user agent, plus headers telling the server we only
+        # want (compressed) HTML
+        headers = {
+            'User-Agent': generate_user_agent(),
+            'Accept': 'text/html,application/xhtml+xml',
+            'Accept-Encoding': 'gzip, deflate'
+        }
+
+        # Make request (served from the on-disk cache when warm)
+        html = await fetch_cached(session, current_url, headers, timeout)
+        if html is None:
+            return
+
+        # Parsing and extraction are pure CPU work; hand them to the
+        # parse pool so the loop keeps servicing the other fetches
+        loop = asyncio.get_running_loop()
+        updates, new_urls = await loop.run_in_executor(
+            get_parse_pool(), parse_page, html, current_url, base_domain, company_name
+        )
+
+        # Merge back on the event loop, the only place results and the
+        # frontier are touched
+        for page_type, url in updates['key_pages'].items():
+            if not results[page_type]:
+                results[page_type] = url
+
+        # Team members are only kept from the page that won the
+        # team_page_url slot
+        if updates['contacts'] and results['team_page_url'] == current_url:
+            results['contacts'].extend(updates['contacts'])
+
+        results['emails'].update(updates['emails'])
+        results['phone_numbers'].update(updates['phone_numbers'])
+        results['social_links'].update(updates['social_links'])
+
+        for href in new_urls:
+            if href not in enqueued:
+                enqueued.add(href)
+                queue.put_nowait(href)
+
+    async def worker(session: aiohttp.ClientSession) -> None:
+        """Pull URLs off the frontier until the crawl is drained"""
+        while True:
+            current_url = await queue.get()
             try:
-                # Generate random user agent
-                headers = {'User-Agent': generate_user_agent()}
-                
-                # Make request
-                async with session.get(current_url, headers=headers, timeout=timeout) as response:
-                    if response.status != 200:
-                        continue
-                        
-                    # Parse HTML
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Check if this is a key page
-                    for page_type, patterns in key_page_patterns.items():
-                        if not results[page_type]:
-                            for pattern in patterns:
-                                if re.search(pattern, current_url, re.IGNORECASE):
-                                    results[page_type] = current_url
-                                    break
-                    
-                    # Extract contact information
-                    extract_contact_info(soup, results)
-                    
-                    # Extract social links
-                    extract_social_links(soup, results)
-                    
-                    # Extract team members if this is a team page
-                    if results['team_page_url'] == current_url:
-                        extract_team_members(soup, results)
-                    
-                    # Find links to other pages on the same domain
-                    links = soup.find_all('a', href=True)
-                    for link in links:
-                        href = link['href']
-                        
-                        # Make absolute URL
-                        if not href.startswith('http'):
-                            href = urljoin(current_url, href)
-                            
-                        # Check if URL is on the same domain
-                        if urlparse(href).netloc == base_domain and href not in visited and href not in to_visit:
-                            to_visit.append(href)
-                            
+                # Dedup happened at enqueue time; only the page cap is
+                # checked here
+                if len(visited) >= max_pages:
+                    continue
+                visited.add(current_url)
+                await crawl_page(session, current_url)
             except Exception as e:
                 logger.error(f"Error scraping {current_url}: {str(e)}")
+            finally:
+                queue.task_done()
+
+    # Fan the frontier out to the workers over the shared session; join
+    # returns when every enqueued URL has been processed or skipped
+    session = get_session()
+    workers = [asyncio.create_task(worker(session)) for _ in range(num_workers)]
+    await queue.join()
+    for w in workers:
+        w.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
     
     # Convert sets to lists for JSON serialization
     results['emails'] = list(results['emails'])
@@ -136,78 +367,69 @@ async def scrape_website_contact_data(
     return results
 
 
-def extract_contact_info(soup: BeautifulSoup, results: Dict[str, Any]) -> None:
-    """Extract contact information from a webpage"""
-    # Extract emails
-    content = soup.get_text()
-    
+def extract_contact_info(html: str, results: Dict[str, Any]) -> None:
+    """
+    Extract contact information from a webpage.
+
+    The regexes run on the raw HTML string: they don't need document
+    structure, so this skips assembling a full text copy of the page
+    and also catches addresses that only appear in mailto:/tel:
+    attributes rather than visible text.
+    """
     # Find emails
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    emails = re.findall(email_pattern, content)
-    for email in emails:
+    for email in _EMAIL_RE.findall(html):
         results['emails'].add(email.lower())
-    
+
     # Find phone numbers
-    phone_pattern = r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-    phones = re.findall(phone_pattern, content)
-    for phone in phones:
+    for phone in _PHONE_RE.findall(html):
         results['phone_numbers'].add(phone)
 
 
-def extract_social_links(soup: BeautifulSoup, results: Dict[str, Any]) -> None:
-    """Extract social media links"""
-    social_patterns = {
-        'linkedin': r'linkedin\.com',
-        'twitter': r'twitter\.com',
-        'facebook': r'facebook\.com',
-        'instagram': r'instagram\.com'
-    }
-    
-    links = soup.find_all('a', href=True)
-    for link in links:
-        href = link['href']
-        for platform, pattern in social_patterns.items():
-            if re.search(pattern, href, re.IGNORECASE):
-                results['social_links'][platform] = href
-                break
+def extract_social_links(hrefs: List[str], results: Dict[str, Any]) -> None:
+    """Extract social media links from a page's anchor hrefs"""
+    for href in hrefs:
+        match = _SOCIAL_RE.search(href)
+        if match:
+            results['social_links'][match.group(1).lower()] = href
 
 
-def extract_team_members(soup: BeautifulSoup, results: Dict[str, Any]) -> None:
+def extract_team_members(tree: LexborHTMLParser, results: Dict[str, Any]) -> None:
     """Extract team members information from a team page"""
     # This is a simplified approach that would be enhanced in production
-    
-    # Look for common team member containers
-    member_containers = soup.select('.team-member, .employee, .staff, .person, .profile')
-    
+
+    # Look for common team member containers, one joined selector call
+    member_containers = tree.css('.team-member, .employee, .staff, .person, .profile')
+
     if not member_containers:
-        # Try looking for other common patterns
-        member_containers = soup.find_all(['div', 'li'], class_=lambda c: c and any(
-            x in str(c).lower() for x in ['team', 'member', 'employee', 'staff', 'profile']
-        ))
-    
+        # Try looking for other common patterns in class names, one
+        # precompiled regex search per candidate node
+        member_containers = [
+            node for node in tree.css('div[class], li[class]')
+            if _TEAM_CLASS_RE.search(node.attributes.get('class') or '')
+        ]
+
     for container in member_containers:
         try:
             # Try to extract name
-            name_elem = container.find(['h2', 'h3', 'h4', 'strong', 'b'])
-            name = name_elem.text.strip() if name_elem else None
-            
+            name_elem = container.css_first('h2, h3, h4, strong, b')
+            name = name_elem.text(strip=True) if name_elem else None
+
             if not name:
                 continue
-                
+
             # Try to extract title
             title = None
-            p_tags = container.find_all('p')
-            for p in p_tags:
-                text = p.text.strip()
+            for p in container.css('p'):
+                text = p.text(strip=True)
                 if text and text != name and len(text) < 100:
                     title = text
                     break
-            
+
             # Try to extract email
             email = None
-            email_elem = container.find('a', href=lambda h: h and 'mailto:' in h)
+            email_elem = container.css_first('a[href*="mailto:"]')
             if email_elem:
-                email = email_elem['href'].replace('mailto:', '').strip()
+                email = (email_elem.attributes.get('href') or '').replace('mailto:', '').strip()
                 results['emails'].add(email.lower())
             
             # Split name into first and last name
@@ -258,8 +480,8 @@ async def predict_email_format(
             'confidence': 0.3
         }
     
-    formats = {}
-    
+    format_counts = Counter()
+
     for email in known_emails:
         # Only process emails from the target domain
         if not email.endswith(f'@{domain}'):
@@ -285,25 +507,23 @@ async def predict_email_format(
                 format_type = 'flast'
         
         if format_type:
-            formats[format_type] = formats.get(format_type, 0) + 1
-    
-    if not formats:
+            format_counts[format_type] += 1
+
+    if not format_counts:
         return {
             'primary_format': 'first.last',
             'formats': ['first.last', 'firstlast'],
             'confidence': 0.3
         }
-    
-    # Find most common format
-    primary_format = max(formats.items(), key=lambda x: x[1])[0]
-    
-    # Sort formats by frequency
-    sorted_formats = sorted(formats.items(), key=lambda x: x[1], reverse=True)
+
+    # Formats sorted by frequency in one pass; the first is the primary
+    sorted_formats = format_counts.most_common()
+    primary_format = sorted_formats[0][0]
     format_list = [f[0] for f in sorted_formats]
-    
+
     # Calculate confidence
-    total = sum(formats.values())
-    confidence = formats[primary_format] / total if total > 0 else 0.3
+    total = sum(format_counts.values())
+    confidence = format_counts[primary_format] / total if total > 0 else 0.3
     
     return {
         'primary_format': primary_format,
@@ -1,23 +1,31 @@
-from fastapi import FastAPI, BackgroundTasks, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, HttpUrl
 from typing import List, Dict, Any, Optional
 import os
+import logging
 import httpx
 from dotenv import load_dotenv
 
 from app.linkedin import scrape_linkedin_profiles
 from app.website import scrape_website_contact_data
-from app.tasks import scrape_leads_task
 from app.celery_worker import create_celery
 
 # Load environment variables
 load_dotenv()
 
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
 # Create FastAPI app
 app = FastAPI(
     title="Lead Generation Scraper Service",
     description="Microservice for scraping lead data from LinkedIn and company websites",
-    version="0.1.0"
+    version="0.1.0",
+    # Scrape results can be large; orjson serializes them several times
+    # faster than the stdlib json encoder
+    default_response_class=ORJSONResponse,
 )
 
 # Initialize Celery
@@ -61,22 +69,23 @@ async def root():
 
 
 @app.post("/linkedin/scrape")
-async def scrape_linkedin(
-    request: ScrapeLinkedInRequest, 
-    background_tasks: BackgroundTasks
-):
+async def scrape_linkedin(request: ScrapeLinkedInRequest):
     """Scrape LinkedIn profiles based on a search URL"""
     task_id = f"linkedin_scrape_{request.project_id}_{id(request)}"
-    
-    # Add scraping task to background
-    background_tasks.add_task(
-        scrape_leads_task,
-        task_id=task_id,
-        source="linkedin",
-        params=request.dict(),
-        callback_url=request.callback_url
+
+    # Hand the scrape to a Celery worker; running it as a FastAPI
+    # background task would keep browser work on the API event loop
+    celery.send_task(
+        "app.tasks.scrape_leads_task",
+        kwargs={
+            "task_id": task_id,
+            "source": "linkedin",
+            "params": request.model_dump(mode="json"),
+            "callback_url": str(request.callback_url) if request.callback_url else None
+        },
+        task_id=task_id
     )
-    
+
     return {
         "status": "processing",
         "task_id": task_id,
@@ -85,22 +94,22 @@ async def scrape_linkedin(
 
 
 @app.post("/website/scrape")
-async def scrape_website(
-    request: ScrapeWebsiteRequest,
-    background_tasks: BackgroundTasks
-):
+async def scrape_website(request: ScrapeWebsiteRequest):
     """Scrape contact information from a company website"""
     task_id = f"website_scrape_{request.project_id}_{id(request)}"
-    
-    # Add scraping task to background
-    background_tasks.add_task(
-        scrape_leads_task,
-        task_id=task_id,
-        source="website",
-        params=request.dict(),
-        callback_url=request.callback_url
+
+    # Queue the scrape on the Celery worker pool
+    celery.send_task(
+        "app.tasks.scrape_leads_task",
+        kwargs={
+            "task_id": task_id,
+            "source": "website",
+            "params": request.model_dump(mode="json"),
+            "callback_url": str(request.callback_url) if request.callback_url else None
+        },
+        task_id=task_id
     )
-    
+
     return {
         "status": "processing",
         "task_id": task_id,
@@ -109,24 +118,21 @@ async def scrape_website(
 
 
 @app.post("/project/scrape")
-async def scrape_project(
-    request: ScrapeProjectRequest,
-    background_tasks: BackgroundTasks
-):
+async def scrape_project(request: ScrapeProjectRequest):
     """Start a comprehensive scrape for a project based on its criteria"""
     task_id = f"project_scrape_{request.project_id}"
-    
+
     # Add project scraping task to Celery queue
     celery.send_task(
         "app.tasks.scrape_project_task",
         kwargs={
             "project_id": request.project_id,
-            "params": request.dict(),
-            "callback_url": request.callback_url
+            "params": request.model_dump(mode="json"),
+            "callback_url": str(request.callback_url) if request.callback_url else None
         },
         task_id=task_id
     )
-    
+
     return {
         "status": "processing",
         "task_id": task_id,